@@ -2,20 +2,56 @@
 Live plotting in Jupyter notebooks
 using the nbagg backend and matplotlib
 """
-from collections import Mapping
-from collections import Sequence
+import math
+import time
+from collections.abc import Mapping
+from collections.abc import Sequence
 from functools import partial
 
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib import ticker
-from matplotlib import cm
 import numpy as np
 from matplotlib.transforms import Bbox
-from numpy.ma import masked_invalid, getmask
 
 from .base import BasePlot
 import qcodes.config
 
+# pcolormesh on matplotlib >= 3.3 accepts center coordinates directly
+# with shading='nearest' and aligns the cells itself
+try:
+    _MPL_SUPPORTS_NEAREST = tuple(
+        int(part) for part in matplotlib.__version__.split('.')[:2]
+    ) >= (3, 3)
+except ValueError:
+    _MPL_SUPPORTS_NEAREST = False
+
+
+def _centers_to_corners(centers, out=None):
+    """
+    Convert a 1D array of grid centers into the size+1 grid corners that
+    pcolormesh expects: midpoints between neighbours, with the edges
+    extrapolated from the first and last spacing. NaN centers propagate
+    into the adjacent corners. Writes into ``out`` (which must hold
+    size+1 elements) when given, instead of allocating.
+    """
+    corners = np.empty(centers.size + 1) if out is None else out
+    corners[1:-1] = 0.5 * (centers[:-1] + centers[1:])
+    corners[0] = centers[0] - 0.5 * (centers[1] - centers[0])
+    corners[-1] = centers[-1] + 0.5 * (centers[-1] - centers[-2])
+    if np.isnan(corners[-1]):
+        # NaN tail (a live sweep part-way through): the midpoint at the
+        # valid/NaN boundary came out NaN, but the last measured row
+        # still needs a closing corner. Extrapolate it from the last
+        # valid spacing, like the masked-array version did.
+        finite = np.flatnonzero(~np.isnan(centers))
+        if finite.size:
+            i = finite[-1]
+            if i >= 1:
+                corners[i + 1] = centers[i] + \
+                    0.5 * (centers[i] - centers[i - 1])
+    return corners
+
 class MatPlot(BasePlot):
     """
     Plot x/y lines or x/y/z heatmap data. The first trace may be included
@@ -47,6 +83,11 @@ class MatPlot(BasePlot):
     # subplots when not explicitly provided
     max_subplot_columns = 3
 
+    # Relative tolerance for color-limit updates: the colorbar is only
+    # rescaled when a limit moves by more than this fraction of the
+    # current range
+    clim_rtol = 1e-3
+
     def __init__(self, *args, figsize=None, interval=1, subplots=None, num=None,
                  **kwargs):
         super().__init__(interval)
@@ -55,8 +96,40 @@ class MatPlot(BasePlot):
             # Subplots is equal to number of args, or 1 if no args provided
             subplots = max(len(args), 1)
 
+        # display throttling: only every _disp_skip-th call to
+        # update_plot actually redraws, so that rendering a slow figure
+        # cannot dominate the measurement loop. _disp_skip is retuned
+        # after each draw from the measured draw time, unless pinned
+        # with set_disp_skip
+        self._disp_skip = 1
+        self._disp_skip_override = None
+        self._skip_counter = 0
+        self._last_draw = 0.0
+        self._last_draw_time = 0.0
+
+        # the trace dicts from self.traces, split by kind, so the update
+        # loops are homogeneous instead of re-testing 'z' in config for
+        # every trace on every tick
+        self._heatmap_traces = []
+        self._line_traces = []
+
+        # the default title as of the last trace change, so add_to_plot
+        # doesn't have to walk all traces twice per add
+        self._default_title = ''
+
+        # corner grids computed by _draw_pcolormesh, keyed by the
+        # identity of the centers array and validated against its shape
+        # and fill state, so rebuilding a mesh with unchanged setpoint
+        # axes skips the pad/diff work
+        self._corner_cache = {}
+
         self._init_plot(subplots, figsize, num=num)
-        
+
+        # the figure is reused by clear(), so the canvas callback only
+        # needs to be hooked up once
+        self.fig.canvas.mpl_connect('resize_event',
+                                    self._invalidate_backgrounds)
+
         # Add data to plot if passed in args, kwargs are passed to all subplots
         for k, arg in enumerate(args):
             if isinstance(arg, Sequence):
@@ -81,10 +154,13 @@ class MatPlot(BasePlot):
         return self.subplots[key]
 
     def _init_plot(self, subplots=None, figsize=None, num=None):
+        # normalize subplots into positional/keyword form once up front,
+        # so a single plt.subplots call serves both cases
         if isinstance(subplots, Mapping):
+            subplots_args = ()
+            subplots_kwargs = subplots
             if figsize is None:
                 figsize = (6, 4)
-            self.fig, self.subplots = plt.subplots(figsize=figsize, num=num, squeeze=False, **subplots)
         else:
             # Format subplots as tuple (nrows, ncols)
             if isinstance(subplots, int):
@@ -95,13 +171,16 @@ class MatPlot(BasePlot):
                 ncols = min(subplots, self.max_subplot_columns)
                 subplots = (nrows, ncols)
 
+            subplots_args = subplots
+            subplots_kwargs = {}
             if figsize is None:
                 # Adjust figsize depending on rows and columns in subplots
                 figsize = self.default_figsize(subplots)
 
-            self.fig, self.subplots = plt.subplots(*subplots, num=num,
-                                                   figsize=figsize,
-                                                   squeeze=False)
+        self.fig, self.subplots = plt.subplots(*subplots_args, num=num,
+                                               figsize=figsize,
+                                               squeeze=False,
+                                               **subplots_kwargs)
 
         # squeeze=False ensures that subplots is always a 2D array independent
         # of the number of subplots.
@@ -109,6 +188,10 @@ class MatPlot(BasePlot):
         # so flatten here
         self.subplots = self.subplots.flatten()
 
+        # fast path for _get_axes: almost all plots have one subplot
+        self._single_ax = self.subplots[0] if len(self.subplots) == 1 \
+            else None
+
         for k, subplot in enumerate(self.subplots):
             # Include `add` method to subplots, making it easier to add data to
             # subplots. Note that subplot kwarg is 1-based, to adhere to
@@ -117,12 +200,33 @@ class MatPlot(BasePlot):
 
         self.title = self.fig.suptitle('')
 
+        # per-axes backgrounds (everything except the line artists) used
+        # for blitting in update_plot; captured lazily by
+        # _capture_backgrounds and dropped whenever the static content
+        # may have changed. _bg_views records the axes view limits at
+        # capture time, so an interactive zoom/pan (which redraws
+        # without going through update_plot) can be detected
+        self._bg = {}
+        self._bg_views = {}
+
+        # heatmap datalim bookkeeping for update_plot, allocated once
+        # here and only cleared per update
+        self._bboxes = {ax: [] for ax in self.subplots}
+
+        # axes whose data changed since their last relim/autoscale; the
+        # limit recomputation is skipped for clean axes
+        self._dirty = {ax: True for ax in self.subplots}
+
     def clear(self, subplots=None, figsize=None):
         """
         Clears the plot window and removes all subplots and traces
         so that the window can be reused.
         """
         self.traces = []
+        self._heatmap_traces = []
+        self._line_traces = []
+        self._default_title = ''
+        self._corner_cache = {}
         self.fig.clf()
         self._init_plot(subplots, figsize, num=self.fig.number)
 
@@ -144,62 +248,96 @@ class MatPlot(BasePlot):
                     args
         """
         # TODO some way to specify overlaid axes?
-        # Note that there is a conversion from subplot kwarg, which is
-        # 1-based, to subplot idx, which is 0-based.
-        ax = self[kwargs.get('subplot', 1) - 1]
+        ax = self._get_axes(kwargs)
         if 'z' in kwargs:
             plot_object = self._draw_pcolormesh(ax, **kwargs)
         else:
             plot_object = self._draw_plot(ax, **kwargs)
 
-        # Specify if axes ticks can have offset or not
-        ax.ticklabel_format(useOffset=use_offset)
+        # Specify if axes ticks can have offset or not; replumbing the
+        # tick formatters is only needed when the setting changes
+        if getattr(ax, '_qcodes_use_offset', None) != use_offset:
+            ax.ticklabel_format(useOffset=use_offset)
+            ax._qcodes_use_offset = use_offset
 
         self._update_labels(ax, kwargs)
-        prev_default_title = self.get_default_title()
+        prev_default_title = self._default_title
 
-        self.traces.append({
+        trace = {
             'config': kwargs,
             'plot_object': plot_object
-        })
+        }
+        self.traces.append(trace)
+        if 'z' in kwargs:
+            self._heatmap_traces.append(trace)
+        else:
+            self._line_traces.append(trace)
 
+        self._default_title = self.get_default_title()
         if prev_default_title == self.title.get_text():
             # in case the user has updated title, don't change it anymore
-            self.title.set_text(self.get_default_title())
+            self.title.set_text(self._default_title)
 
-    def _update_labels(self, ax, config):
-        for axletter in ("x", "y"):
-            if axletter+'label' in config:
-                label = config[axletter+'label']
-            else:
-                label = None
+        # the cached blitting backgrounds no longer match the figure
+        self._invalidate_backgrounds()
 
-            # find if any kwarg from plot.add in the base class
-            # matches xunit or yunit, signaling a custom unit
-            if axletter+'unit' in config:
-                unit = config[axletter+'unit']
-            else:
-                unit = None
-
-            #  find ( more hope to) unit and label from
-            # the data array inside the config
-            getter = getattr(ax, "get_{}label".format(axletter))
-            if axletter in config and not getter():
-                # now if we did not have any kwarg for label or unit
-                # fallback to the data_array
-                if unit is None:
-                    _, unit = self.get_label(config[axletter])
-                if label is None:
-                    label, _ = self.get_label(config[axletter])
-            elif getter():
-                # The axis already has label. Assume that is correct
-                # We should probably check consistent units and error or warn
-                # if not consistent. It's also not at all clear how to handle
-                # labels/names as these will in general not be consistent on
-                # at least one axis
-                return
-            axsetter = getattr(ax, "set_{}label".format(axletter))
-            axsetter("{} ({})".format(label, unit))
+    def _get_axes(self, config):
+        """
+        Return the axes a trace belongs on, from the 1-based ``subplot``
+        entry of its config. The common single-subplot figure is served
+        from a cached reference without any lookups.
+        """
+        ax = self._single_ax
+        if ax is not None and 'subplot' not in config:
+            return ax
+        # conversion from subplot kwarg, which is 1-based, to subplot
+        # idx, which is 0-based
+        return self.subplots[config.get('subplot', 1) - 1]
+
+    def _update_labels(self, ax, config):
+        # unrolled per axis with bound methods, so no getattr or
+        # name-building runs per trace add. As before, an axis that
+        # already has a label stops the whole update (y included)
+        if self._update_axis_label(config, 'x', 'xlabel', 'xunit',
+                                   ax.get_xlabel(), ax.set_xlabel):
+            self._update_axis_label(config, 'y', 'ylabel', 'yunit',
+                                    ax.get_ylabel(), ax.set_ylabel)
+
+    def _update_axis_label(self, config, axletter, labelkey, unitkey,
+                           current_label, setter):
+        """
+        Set one axis label from the trace config, falling back on the
+        data array for missing label/unit. Returns False when the axis
+        already had a label, which also stops the caller from touching
+        the remaining axes.
+        """
+        label = config.get(labelkey)
+
+        # find if any kwarg from plot.add in the base class
+        # matches xunit or yunit, signaling a custom unit
+        unit = config.get(unitkey)
+
+        #  find ( more hope to) unit and label from
+        # the data array inside the config
+        if axletter in config and not current_label:
+            # now if we did not have any kwarg for label or unit
+            # fallback to the data_array
+            if unit is None:
+                _, unit = self.get_label(config[axletter])
+            if label is None:
+                label, _ = self.get_label(config[axletter])
+        elif current_label:
+            # The axis already has label. Assume that is correct
+            # We should probably check consistent units and error or warn
+            # if not consistent. It's also not at all clear how to handle
+            # labels/names as these will in general not be consistent on
+            # at least one axis
+            return False
+        text = "{} ({})".format(label, unit)
+        # rewriting an identical label still invalidates the tick layout
+        if text != current_label:
+            setter(text)
+        return True
 
     @staticmethod
     def default_figsize(subplots):
@@ -220,39 +358,105 @@ class MatPlot(BasePlot):
         """
         update the plot. The DataSets themselves have already been updated
         in update, here we just push the changes to the plot.
+
+        Redraws may be skipped: if the last draw was expensive, only
+        every Nth call actually renders (see set_disp_skip), although a
+        redraw is always forced once the display is more than five
+        update intervals old.
         """
+        self._skip_counter += 1
+        # interval=0 means draw on demand: treat the display as always
+        # stale so no update is ever skipped
+        stale = (self.interval <= 0 or
+                 time.monotonic() - self._last_draw > 5 * self.interval)
+        if self._skip_counter % self._disp_skip and not stale:
+            return
+        # if no trace has new data since the last draw, there is nothing
+        # to push to matplotlib at all; traces with unchanged data are
+        # also skipped individually below
+        any_changed = False
+        for trace in self.traces:
+            fingerprint = self._trace_fingerprint(trace['config'])
+            trace['_changed'] = fingerprint != trace.get('_fingerprint')
+            trace['_fingerprint'] = fingerprint
+            any_changed = any_changed or trace['_changed']
+        if not any_changed:
+            return
+        t0 = time.perf_counter()
+
         # matplotlib doesn't know how to autoscale to a pcolormesh after the
         # first draw (relim ignores it...) so we have to do this ourselves
-        bboxes = dict(zip(self.subplots, [[] for p in self.subplots]))
-
-        for trace in self.traces:
+        bboxes = self._bboxes
+        for bbox_list in bboxes.values():
+            bbox_list.clear()
+
+        heatmap_changed = False
+        for trace in self._heatmap_traces:
+            if not trace['_changed']:
+                continue
+            heatmap_changed = True
             config = trace['config']
             plot_object = trace['plot_object']
-            if 'z' in config:
-                # pcolormesh doesn't seem to allow editing x and y data, only z
-                # so instead, we'll remove and re-add the data.
-                if plot_object:
-                    plot_object.remove()
-
-                ax = self[config.get('subplot', 1) - 1]
-                plot_object = self._draw_pcolormesh(ax, **config)
-                trace['plot_object'] = plot_object
-
-                if plot_object:
-                    bboxes[plot_object.axes].append(
-                        plot_object.get_datalim(plot_object.axes.transData))
-            else:
-                for axletter in 'xy':
-                    setter = 'set_' + axletter + 'data'
-                    if axletter in config:
-                        getattr(plot_object, setter)(config[axletter])
+            mesh_shape = (np.shape(config.get('x')),
+                          np.shape(config.get('y')),
+                          np.shape(config['z']))
+            if plot_object and trace.get('_mesh_shape') == mesh_shape:
+                # the mesh geometry is unchanged, so only z needs
+                # pushing to the existing QuadMesh; this avoids
+                # reallocating the whole mesh every update
+                z = config['z']
+                # NaN entries render as the colormap's 'bad'
+                # (transparent) cells, so no masked wrapper is needed
+                plot_object.set_array(np.ravel(np.asarray(z)))
+                ax = self._get_axes(config)
+                if self._clim_changed(ax, np.nanmin(z), np.nanmax(z)):
+                    plot_object.set_clim(*ax._qcodes_clim)
+                    ax.qcodes_colorbar.update_normal(plot_object)
+                continue
+
+            # pcolormesh doesn't seem to allow editing x and y data, only z
+            # so instead, we'll remove and re-add the data.
+            if plot_object:
+                plot_object.remove()
+
+            ax = self._get_axes(config)
+            plot_object = self._draw_pcolormesh(ax, **config)
+            trace['plot_object'] = plot_object
+            trace['_mesh_shape'] = mesh_shape
+            self._dirty[ax] = True
+
+            if plot_object:
+                bboxes[plot_object.axes].append(
+                    plot_object.get_datalim(plot_object.axes.transData))
+
+        for trace in self._line_traces:
+            if not trace['_changed']:
+                continue
+            config = trace['config']
+            plot_object = trace['plot_object']
+            for axletter in 'xy':
+                setter = 'set_' + axletter + 'data'
+                if axletter in config:
+                    getattr(plot_object, setter)(config[axletter])
+            self._dirty[plot_object.axes] = True
 
+        limits_changed = False
         for ax in self.subplots:
+            # relim/autoscale walk every point of every artist on the
+            # axes, so skip them for axes nothing was pushed to
+            if not self._dirty[ax]:
+                continue
+            self._dirty[ax] = False
             if ax.get_autoscale_on():
+                old_limits = (ax.get_xlim(), ax.get_ylim())
                 ax.relim()
                 if bboxes[ax]:
                     bbox = Bbox.union(bboxes[ax])
-                    if np.all(np.isfinite(ax.dataLim)):
+                    dl = ax.dataLim
+                    # four scalar checks; cheaper than np.all(np.isfinite)
+                    # on the bbox, which allocates and reduces an array
+                    if math.isfinite(dl.x0) and math.isfinite(dl.x1) and \
+                            math.isfinite(dl.y0) and math.isfinite(dl.y1):
                         # should take care of the case of lines + heatmaps
                         # where there's already a finite dataLim from relim
                         ax.dataLim.set(Bbox.union(ax.dataLim, bbox))
@@ -261,8 +465,129 @@ class MatPlot(BasePlot):
                         # so just completely overwrite it
                         ax.dataLim = bbox
                 ax.autoscale()
+                if (ax.get_xlim(), ax.get_ylim()) != old_limits:
+                    limits_changed = True
+
+        # when only line data changed, restoring the cached backgrounds
+        # and blitting the lines on top is much cheaper than
+        # re-rasterizing the whole figure (pcolormesh quads in
+        # particular). Anything else invalidates the backgrounds and
+        # falls back to a full draw.
+        canvas = self.fig.canvas
+        if heatmap_changed or limits_changed or \
+                not getattr(canvas, 'supports_blit', False):
+            self._invalidate_backgrounds()
+            # draw_idle defers the paint to the next event-loop tick, so
+            # back-to-back updates collapse into a single rasterization
+            # instead of blocking here once per call
+            canvas.draw_idle()
+        else:
+            # an interactive zoom/pan redraws the canvas without going
+            # through here; blitting on top of a pre-zoom background
+            # would paint the lines against the old view
+            if self._bg and any(
+                    (ax.get_xlim(), ax.get_ylim()) != self._bg_views.get(ax)
+                    for ax in self.subplots):
+                self._invalidate_backgrounds()
+            if not self._bg:
+                self._capture_backgrounds()
+            self._blit_lines()
+
+        self._last_draw = time.monotonic()
+        self._last_draw_time = time.perf_counter() - t0
+        if self._disp_skip_override is None:
+            if self.interval > 0:
+                # aim to spend at most ~10% of the update interval
+                # drawing
+                self._disp_skip = max(
+                    1, int(self._last_draw_time / (0.1 * self.interval)))
+            else:
+                self._disp_skip = 1
 
+    @staticmethod
+    def _trace_fingerprint(config):
+        """
+        A cheap fingerprint of a trace's data: shape, dtype, buffer
+        address, the number of filled (non-NaN) entries and the sum of
+        the values of each of x/y/z. The sum catches in-place overwrites
+        of already-filled values (and any change at all for integer
+        arrays), which shape and fill count alone cannot see; it is a
+        single reduction pass, still far cheaper than a draw.
+        """
+        fingerprint = []
+        for axletter in 'xyz':
+            data_array = config.get(axletter)
+            if data_array is None:
+                continue
+            arr = np.asarray(data_array)
+            if arr.dtype.kind == 'f':
+                filled = int(np.count_nonzero(~np.isnan(arr)))
+                digest = float(np.nansum(arr))
+            else:
+                filled = arr.size
+                digest = float(arr.sum())
+            fingerprint.append((arr.shape, arr.dtype.str,
+                                arr.ctypes.data, filled, digest))
+        return tuple(fingerprint)
+
+    def set_disp_skip(self, n):
+        """
+        Pin the display throttling of update_plot: only every n-th call
+        will actually redraw. Pass None to return to automatic tuning
+        based on the measured draw time.
+
+        Args:
+            n (Optional[int]): redraw every n-th update, or None for
+                automatic
+        """
+        self._disp_skip_override = n
+        if n is not None:
+            self._disp_skip = max(1, int(n))
+
+    def _invalidate_backgrounds(self, event=None):
+        """
+        Drop the cached per-axes backgrounds used for blitting, forcing a
+        full draw (and background recapture) on the next update.
+
+        Also connected to the canvas resize_event, hence the unused
+        event argument.
+        """
+        self._bg.clear()
+        self._bg_views.clear()
+
+    def _capture_backgrounds(self):
+        """
+        Cache the static background of each axes for blitting: a full
+        render of everything except the line artists, which update_plot
+        redraws on top of it.
+        """
+        lines = [trace['plot_object'] for trace in self._line_traces
+                 if trace['plot_object']]
+        for line in lines:
+            line.set_visible(False)
         self.fig.canvas.draw()
+        for ax in self.subplots:
+            self._bg[ax] = self.fig.canvas.copy_from_bbox(ax.bbox)
+            self._bg_views[ax] = (ax.get_xlim(), ax.get_ylim())
+        for line in lines:
+            line.set_visible(True)
+
+    def _blit_lines(self):
+        """
+        Redraw only the line artists on top of the cached backgrounds
+        and blit the result to the canvas, leaving everything else (in
+        particular pcolormeshes) untouched.
+        """
+        canvas = self.fig.canvas
+        for ax in self.subplots:
+            canvas.restore_region(self._bg[ax])
+        for trace in self._line_traces:
+            plot_object = trace['plot_object']
+            if plot_object:
+                plot_object.axes.draw_artist(plot_object)
+        for ax in self.subplots:
+            canvas.blit(ax.bbox)
+        canvas.flush_events()
 
     def _draw_plot(self, ax, y, x=None, fmt=None, subplot=1,
                    xlabel=None,
@@ -276,9 +601,18 @@ class MatPlot(BasePlot):
         # already described by ax, and it's not a kwarg to matplotlib's ax.plot.
         # But I didn't want to strip it out of kwargs earlier because it should
         # stay part of trace['config'].
-        args = [arg for arg in [x, y, fmt] if arg is not None]
-
-        line, = ax.plot(*args, **kwargs)
+        # branch on the possible signatures directly rather than
+        # filtering a temporary list of args for None
+        if x is None:
+            if fmt is None:
+                line, = ax.plot(y, **kwargs)
+            else:
+                line, = ax.plot(y, fmt, **kwargs)
+        else:
+            if fmt is None:
+                line, = ax.plot(x, y, **kwargs)
+            else:
+                line, = ax.plot(x, y, fmt, **kwargs)
         return line
 
     def _draw_pcolormesh(self, ax, z, x=None, y=None, subplot=1,
@@ -294,56 +628,102 @@ class MatPlot(BasePlot):
         # described by ax, and it's not a kwarg to matplotlib's ax.plot. But I
         # didn't want to strip it out of kwargs earlier because it should stay
         # part of trace['config'].
-        args_masked = [masked_invalid(arg) for arg in [x, y, z]
-                      if arg is not None]
-
-        if np.any([np.all(getmask(arg)) for arg in args_masked]):
-            # if the z array is masked, don't draw at all
-            # there's nothing to draw, and anyway it throws a warning
-            # pcolormesh does not accept masked x and y axes, so we do not need
-            # to check for them.
-            return False
+        # a single finiteness pass per array replaces masked_invalid,
+        # which copied the data into a masked array. Everything stays a
+        # plain ndarray with NaN holes: the colormap renders NaN cells
+        # as 'bad' (transparent) just like masked ones, and plain
+        # arithmetic is far faster than np.ma.
+        args_masked = []
+        corner_keys = []
+        z_invalid = None
+        for arg in (x, y, z):
+            if arg is None:
+                continue
+            arr = np.asarray(arg)
+            n_invalid = 0
+            if arr.dtype.kind == 'f':
+                invalid = ~np.isfinite(arr)
+                n_invalid = np.count_nonzero(invalid)
+                if n_invalid == arr.size:
+                    # if the array is fully masked, don't draw at all
+                    # there's nothing to draw, and anyway it throws a
+                    # warning
+                    return False
+                if n_invalid:
+                    # masked_invalid also caught inf; keep the holes NaN
+                    arr = np.where(invalid, np.nan, arr)
+                    if arg is z:
+                        z_invalid = invalid
+            if arg is not z:
+                # cache validation for the corner grids: setpoint axes
+                # are written once, so identity, shape and fill state
+                # pin down their content
+                corner_keys.append((id(arg), arr.shape, n_invalid))
+            args_masked.append(arr)
 
         if 'cmap' not in kwargs:
             kwargs['cmap'] = qcodes.config['gui']['defaultcolormap']
+        use_nearest = False
         if x is not None and y is not None:
-            # If x and y are provided, modify the arrays such that they
-            # correspond to grid corners instead of grid centers.
-            # This is to ensure that pcolormesh centers correctly and
-            # does not ignore edge points.
-            args = []
-            for k, arr in enumerate(args_masked[:-1]):
-                # If a two-dimensional array is provided, only consider the
-                # first row/column, depending on the axis
-                if arr.ndim > 1:
-                    arr = arr[0] if k == 0 else arr[:,0]
-
-                if np.ma.is_masked(arr[1]):
-                    # Only the first element is not nan, in this case pad with
-                    # a value, and separate their values by 1
-                    arr_pad = np.pad(arr, (1, 0), mode='symmetric')
-                    arr_pad[:2] += [-0.5, 0.5]
-                else:
-                    # Add padding on both sides equal to endpoints
-                    arr_pad = np.pad(arr, (1, 1), mode='symmetric')
-                    # Add differences to edgepoints (may be nan)
-                    arr_pad[0] += arr_pad[1] - arr_pad[2]
-                    arr_pad[-1] += arr_pad[-2] - arr_pad[-3]
-
-                    diff = np.ma.diff(arr_pad) / 2
-                    # Insert value at beginning and end of diff to ensure same
-                    # length
-                    diff = np.insert(diff, 0, diff[0])
-
-                    arr_pad += diff
-                    # Ignore final value
-                    arr_pad = arr_pad[:-1]
-                    # C is allowed to be masked in pcolormesh but x and y are
-                    # not so replace any empty data with nans
-                args.append(np.ma.filled(arr_pad, fill_value=np.nan))
-            args.append(args_masked[-1])
+            if (_MPL_SUPPORTS_NEAREST and 'shading' not in kwargs and
+                    corner_keys[0][2] == 0 and corner_keys[1][2] == 0):
+                # fully filled center axes: let pcolormesh do the
+                # center-to-edge alignment itself and skip the corner
+                # construction entirely
+                use_nearest = True
+                kwargs['shading'] = 'nearest'
+                args = []
+                for k, arr in enumerate(args_masked[:-1]):
+                    # If a two-dimensional array is provided, only
+                    # consider the first row/column, depending on the axis
+                    if arr.ndim > 1:
+                        arr = arr[0] if k == 0 else arr[:, 0]
+                    args.append(arr)
+                args.append(args_masked[-1])
+            else:
+                # If x and y are provided, modify the arrays such that they
+                # correspond to grid corners instead of grid centers.
+                # This is to ensure that pcolormesh centers correctly and
+                # does not ignore edge points.
+                args = []
+                for k, arr in enumerate(args_masked[:-1]):
+                    arr_id, arr_shape, arr_n_invalid = corner_keys[k]
+                    validation = (arr_shape, arr_n_invalid)
+                    cached = self._corner_cache.get(arr_id)
+                    if cached is not None and cached[0] == validation:
+                        args.append(cached[1])
+                        continue
+
+                    # If a two-dimensional array is provided, only consider
+                    # the first row/column, depending on the axis
+                    if arr.ndim > 1:
+                        arr = arr[0] if k == 0 else arr[:,0]
+
+                    centers = arr
+                    # a stale cache entry of the right size (the fill
+                    # state moved on) is recycled as the output buffer;
+                    # pcolormesh copies the coordinates it is given, so
+                    # no live mesh aliases it
+                    buf = None
+                    if cached is not None and \
+                            cached[1].size == centers.size + 1:
+                        buf = cached[1]
+                    if np.isnan(centers[1]):
+                        # Only the first element is not nan, in this case
+                        # give it a cell of width 1 and leave the rest
+                        # undefined
+                        corners = buf if buf is not None \
+                            else np.empty(centers.size + 1)
+                        corners[0] = centers[0] - 0.5
+                        corners[1] = centers[0] + 0.5
+                        corners[2:] = np.nan
+                    else:
+                        corners = _centers_to_corners(centers, out=buf)
+                    self._corner_cache[arr_id] = (validation, corners)
+                    args.append(corners)
+                args.append(args_masked[-1])
         else:
-            # Only the masked value of z is used as a mask
+            # Only z was provided; its NaN holes mark the missing cells
             args = args_masked[-1:]
 
         if 'edgecolors' not in kwargs:
@@ -354,8 +734,10 @@ class MatPlot(BasePlot):
             kwargs['edgecolors'] = 'face'
         pc = ax.pcolormesh(*args, **kwargs)
 
-        # Set x and y limits if arrays are provided
-        if x is not None and y is not None:
+        # Set x and y limits if corner arrays are provided; on the
+        # nearest path the limits would crop the outer half-cells, so
+        # matplotlib's own autoscaling is left in charge there
+        if x is not None and y is not None and not use_nearest:
             ax.set_xlim(np.nanmin(args[0]), np.nanmax(args[0]))
             ax.set_ylim(np.nanmin(args[1]), np.nanmax(args[1]))
 
@@ -364,8 +746,14 @@ class MatPlot(BasePlot):
             ax.locator_params(nbins=nticks)
 
         if getattr(ax, 'qcodes_colorbar', None):
-            # update_normal doesn't seem to work...
-            ax.qcodes_colorbar.update_bruteforce(pc)
+            # update_normal doesn't seem to work on old matplotlib...
+            # but update_bruteforce was removed in 3.3, where
+            # update_normal does the job
+            colorbar = ax.qcodes_colorbar
+            if hasattr(colorbar, 'update_bruteforce'):
+                colorbar.update_bruteforce(pc)
+            else:
+                colorbar.update_normal(pc)
         else:
             # TODO: what if there are several colormeshes on this subplot,
             # do they get the same colorscale?
@@ -386,13 +774,42 @@ class MatPlot(BasePlot):
             label = "{} ({})".format(zlabel, zunit)
             ax.qcodes_colorbar.set_label(label)
 
-        # Scale colors if z has elements
-        cmin = np.nanmin(args_masked[-1])
-        cmax = np.nanmax(args_masked[-1])
-        ax.qcodes_colorbar.set_clim(cmin, cmax)
+        # Scale colors if z has elements. Gathering the valid values
+        # once and reducing them with plain min/max beats two NaN-aware
+        # reductions over the full array; the invalid mask was already
+        # computed above.
+        z_flat = np.ravel(args_masked[-1])
+        if z_invalid is not None:
+            z_valid = z_flat[~np.ravel(z_invalid)]
+        else:
+            z_valid = z_flat
+        # the all-masked early exit above guarantees z_valid is nonempty
+        cmin = z_valid.min()
+        cmax = z_valid.max()
+        if self._clim_changed(ax, cmin, cmax):
+            # set the limits on the mappable (Colorbar.set_clim was
+            # removed in matplotlib 3.3) and refresh the colorbar, as
+            # the update_plot fast path does
+            pc.set_clim(cmin, cmax)
+            ax.qcodes_colorbar.update_normal(pc)
 
         return pc
 
+    def _clim_changed(self, ax, cmin, cmax):
+        """
+        Decide whether the color limits moved enough to be worth a
+        colorbar rescale: both limits within clim_rtol of the current
+        range count as unchanged. Records the new limits on the axes
+        (as ``ax._qcodes_clim``) when they did change.
+        """
+        old = getattr(ax, '_qcodes_clim', None)
+        if old is not None:
+            tol = self.clim_rtol * (old[1] - old[0])
+            if abs(cmin - old[0]) <= tol and abs(cmax - old[1]) <= tol:
+                return False
+        ax._qcodes_clim = (cmin, cmax)
+        return True
+
     def save(self, filename=None):
         """
         Save current plot to filename, by default
@@ -0,0 +1,60 @@
+"""
+Tests for the annotation JSON helpers of the device annotator.
+
+The annotations file may be written by orjson (which serializes tuples
+as lists) or by the standard library; a save/load round trip must hand
+back positions that compare equal to the (x, y) tuples built for fresh
+clicks.
+"""
+from unittest import TestCase, skipIf
+import os
+import tempfile
+
+try:
+    from qcodes.utils.qcodes_device_annotator import (
+        _dump_json, _load_json, _normalize_positions)
+    noAnnotator = False
+except Exception:
+    # the annotator needs PyQt5
+    noAnnotator = True
+
+
+@skipIf(noAnnotator, '***device annotator cannot be imported***')
+class TestAnnotationsRoundTrip(TestCase):
+
+    def setUp(self):
+        self.annotations = {
+            'font': {'family': 'decorative'},
+            'qdac': {
+                'ch01_v': {
+                    'labelpos': (10, 20),
+                    'labelstring': 'qdac_ch01_v ',
+                    'annotationpos': (30, 40),
+                    'value': 'NaN',
+                },
+            },
+        }
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'deviceimage_annotations.json')
+            _dump_json(self.annotations, path)
+            loaded = _normalize_positions(_load_json(path))
+
+        self.assertEqual(loaded, self.annotations)
+
+        # the positions must be tuples, not lists: the same-position
+        # click guard compares them against fresh click tuples
+        paramdata = loaded['qdac']['ch01_v']
+        self.assertIsInstance(paramdata['labelpos'], tuple)
+        self.assertEqual(paramdata['labelpos'], (10, 20))
+        self.assertIsInstance(paramdata['annotationpos'], tuple)
+        self.assertEqual(paramdata['annotationpos'], (30, 40))
+
+    def test_normalize_empty_and_nested(self):
+        data = {'font': {'family': 'decorative'},
+                'inst': {'sub': {'param': {'labelpos': [1, 2]}},
+                         'other': {}}}
+        normalized = _normalize_positions(data)
+        self.assertIs(normalized, data)
+        self.assertEqual(data['inst']['sub']['param']['labelpos'], (1, 2))
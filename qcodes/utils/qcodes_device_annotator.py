@@ -4,20 +4,129 @@ import sys
 import os
 import json
 import glob
+import time
+import hashlib
 import PyQt5.QtWidgets as qt
 import PyQt5.QtGui as gui
 import PyQt5.QtCore as core
 
 from shutil import copyfile
-import copy
 from qcodes.instrument.channel import ChannelList
 from qcodes.utils.helpers import foreground_qt_window
 
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _dump_json(obj, path):
+    """
+    Serialize obj to a JSON file at path, via orjson when available
+    """
+    if _orjson is not None:
+        with open(path, 'wb') as fid:
+            fid.write(_orjson.dumps(obj))
+    else:
+        with open(path, 'w') as fid:
+            json.dump(obj, fid)
+
+
+def _load_json(path):
+    """
+    Deserialize a JSON file at path, via orjson when available
+    """
+    if _orjson is not None:
+        with open(path, 'rb') as fid:
+            return _orjson.loads(fid.read())
+    with open(path, 'r') as fid:
+        return json.load(fid)
+
+
+def _normalize_positions(data):
+    """
+    Convert the labelpos/annotationpos entries of a (possibly nested)
+    annotations dict to tuples, in place, and return the dict. JSON has
+    no tuple type, so loaded positions come back as lists and would
+    compare unequal to the (x, y) click tuples built at runtime.
+    """
+    for val in data.values():
+        if not hasattr(val, 'items'):
+            continue
+        for poskey in ('labelpos', 'annotationpos'):
+            pos = val.get(poskey)
+            if pos is not None:
+                val[poskey] = tuple(pos)
+        _normalize_positions(val)
+    return data
+
+# cache of decoded base images, keyed by (filename, mtime) so a
+# replaced file is re-decoded, matching the key of the on-disk PNG
+# cache in makePNG. QPixmapCache is not used since rendering happens on
+# QImages (see _paint_image)
+_image_cache = {}
+
+
+def _load_base_image(filename):
+    """
+    Return the decoded QImage for filename, decoding it at most once
+    per on-disk version of the file
+    """
+    key = (filename, os.path.getmtime(filename))
+    image = _image_cache.get(key)
+    if image is None:
+        image = gui.QImage(filename)
+        # drop decodes of older versions of the same file
+        for stale in [k for k in _image_cache if k[0] == filename]:
+            del _image_cache[stale]
+        _image_cache[key] = image
+    return image
+
+
+# fonts and their metrics, keyed by (family, size). Font construction and
+# metrics queries go through Qt's font database and are slow enough to be
+# worth caching across renders
+_font_cache = {}
+
+
+def _get_font(family, size):
+    """
+    Return a cached (QFont, QFontMetrics) pair for the given family/size
+    """
+    key = (family, size)
+    entry = _font_cache.get(key)
+    if entry is None:
+        font = gui.QFont(family, size)
+        entry = (font, gui.QFontMetrics(font))
+        _font_cache[key] = entry
+    return entry
+
+
+# QApplication created on demand; kept referenced so it survives the
+# function that made it
+_qapp = None
+
+
+def _ensure_qapplication():
+    """
+    Return the running QApplication, creating (and keeping) one if needed
+    """
+    global _qapp
+    app = qt.QApplication.instance()
+    if app is None:
+        _qapp = app = qt.QApplication(sys.argv)
+    return app
+
+
 class MakeDeviceImage(qt.QWidget):
     """
     Class for clicking and adding labels
     """
 
+    # emitted from saveAndClose with the annotation data and the (copied)
+    # image filename
+    annotationsReady = core.pyqtSignal(dict, str)
+
     def __init__(self, folder, station):
 
         super().__init__()
@@ -29,6 +138,12 @@ class MakeDeviceImage(qt.QWidget):
         self._data = {}
         self.filename = None
 
+        # renders are capped at target_fps; faster requests are coalesced
+        # into a single deferred render (see _request_render)
+        self.target_fps = 30
+        self._last_render = 0.0
+        self._render_scheduled = False
+
         # FRONTEND
 
         grid = qt.QGridLayout()
@@ -140,7 +255,16 @@ class MakeDeviceImage(qt.QWidget):
                                       os.getcwd(),
                                       "Image files(*.jpg *.png *.jpeg)")
         self.filename = filename[0]
-        self.pixmap = gui.QPixmap(filename[0])
+        # decode into a QImage; painting happens on QImage copies and the
+        # result is only converted to a QPixmap for display
+        self.image = _load_base_image(filename[0])
+        self.pixmap = gui.QPixmap.fromImage(self.image)
+        # annotations live on a transparent overlay, so adding an item
+        # only paints that item; the base image is never repainted
+        self._overlay = gui.QImage(self.image.size(),
+                                   gui.QImage.Format_ARGB32_Premultiplied)
+        self._overlay.fill(core.Qt.transparent)
+        self._overlay_font = None
         width = self.pixmap.width()
         height = self.pixmap.height()
 
@@ -169,6 +293,8 @@ class MakeDeviceImage(qt.QWidget):
         # verify valid
         if not self.treeView.selectedIndexes():
             return
+        if getattr(self, 'image', None) is None:
+            return
         selected = self.treeView.selectedIndexes()[0]
         selected_instrument = self.get_full_name(selected)
         selected_parameter = selected.data()
@@ -184,16 +310,39 @@ class MakeDeviceImage(qt.QWidget):
 
         inner_data = tempdict
 
-        if selected_parameter not in inner_data.keys():
+        if self.formatterfield.text():
+            formatstring = '{' + self.formatterfield.text() + "}"
+        else:
+            formatstring = ''
+
+        # clicking the same position again with unchanged settings would
+        # just re-render an identical image, so skip the redraw entirely
+        previous = inner_data.get(selected_parameter, {})
+        clickpos = (self.click_x, self.click_y)
+        if insertlabel and previous.get('labelpos') == clickpos and \
+                previous.get('labelstring') == self.labelfield.text():
+            return
+        if insertannotation and previous.get('annotationpos') == clickpos \
+                and previous.get('annotationformatter', '') == formatstring:
+            return
+
+        was_empty = not previous
+
+        if selected_parameter not in inner_data:
             inner_data[selected_parameter] = {}
 
         if insertlabel:
-            inner_data[selected_parameter]['labelpos'] = (self.click_x, self.click_y)
-            inner_data[selected_parameter]['labelstring'] = self.labelfield.text()
+            inner_data[selected_parameter]['labelpos'] = clickpos
+            # resolve the default label once at insertion time, so the
+            # render loop never has to build a fallback string
+            labelstring = self.labelfield.text()
+            if not labelstring:
+                labelstring = "{}_{} ".format("_".join(selected_instrument),
+                                              selected_parameter)
+            inner_data[selected_parameter]['labelstring'] = labelstring
         elif insertannotation:
-            inner_data[selected_parameter]['annotationpos'] = (self.click_x, self.click_y)
-            if self.formatterfield.text():
-                formatstring  = '{' + self.formatterfield.text() + "}"
+            inner_data[selected_parameter]['annotationpos'] = clickpos
+            if formatstring:
                 inner_data[selected_parameter]['annotationformatter'] = formatstring
                 inner_data[selected_parameter]['value'] = formatstring
             else:
@@ -206,10 +355,51 @@ class MakeDeviceImage(qt.QWidget):
         else:
             self._data['font']['family'] = self.textfont.family()
             self._data['font']['label_size'] = self.textfont.pointSize()
-        # draw it
-        self.imageCanvas, _ = self._renderImage(self._data,
-                                                self.imageCanvas,
-                                                self.filename)
+
+        # draw it: a brand new entry only needs itself painted onto the
+        # overlay; moved entries (and font changes) need a full rebuild
+        if was_empty and self._data['font'] == self._overlay_font:
+            piece = {selected_parameter: inner_data[selected_parameter]}
+            for level in reversed(selected_instrument):
+                piece = {level: piece}
+            piece['font'] = self._data['font']
+            self._paint_annotations(self._overlay, piece)
+        else:
+            self._redraw_overlay()
+        self._request_render()
+
+    def _redraw_overlay(self):
+        """
+        Rebuild the transparent annotations overlay from scratch
+        """
+        self._overlay.fill(core.Qt.transparent)
+        self._paint_annotations(self._overlay, self._data)
+        self._overlay_font = dict(self._data.get('font', {}))
+
+    def _request_render(self):
+        """
+        Render now if the last render is old enough, else coalesce this
+        and any further requests into one render scheduled via QTimer
+        """
+        wait = 1/self.target_fps - (time.perf_counter() - self._last_render)
+        if wait <= 0:
+            self._render_now()
+        elif not self._render_scheduled:
+            self._render_scheduled = True
+            core.QTimer.singleShot(int(wait*1000), self._render_now)
+
+    def _render_now(self):
+        """
+        Compose the base image and the annotations overlay onto the canvas
+        """
+        self._render_scheduled = False
+        self._last_render = time.perf_counter()
+        image = self.image.copy()
+        painter = gui.QPainter(image)
+        painter.drawImage(0, 0, self._overlay)
+        painter.end()
+        self.imageCanvas.setPixmap(gui.QPixmap.fromImage(image))
+
     @staticmethod
     def get_full_name(selected):
         myp = selected
@@ -225,18 +415,19 @@ class MakeDeviceImage(qt.QWidget):
         return fullname
 
     def remove_label_and_annotation(self):
+        if getattr(self, 'image', None) is None:
+            return
         selected = self.treeView.selectedIndexes()[0]
         selected_instrument = self.get_full_name(selected)
         selected_parameter = selected.data()
         tempdata = self._data
         for level in selected_instrument:
             tempdata = tempdata[level]
-        if selected_parameter in tempdata.keys():
+        if selected_parameter in tempdata:
             tempdata[selected_parameter] = {}
-        # draw it
-        self.imageCanvas, _ = self._renderImage(self._data,
-                                                self.imageCanvas,
-                                                self.filename)
+        # draw it (deletions are the O(N) full-rebuild case)
+        self._redraw_overlay()
+        self._request_render()
 
     def saveAndClose(self):
         """
@@ -253,108 +444,117 @@ class MakeDeviceImage(qt.QWidget):
         self.filename = rawpath
 
         datafilename = os.path.join(self.folder, 'deviceimage_annotations.json')
-        with open(datafilename, 'w') as fid:
-            json.dump(self._data, fid)
+        _dump_json(self._data, datafilename)
+
+        self.annotationsReady.emit(self._data, self.filename)
         self.close()
 
     @staticmethod
-    def _renderImage(fulldata, canvas, filename, title=None):
+    def _paint_image(fulldata, filename, title=None, base=None):
         """
-        Render an image
+        Paint the annotations onto a copy of the device image and return
+        the result as a QImage
+
+        Args:
+            base: an already decoded QImage of the device image. If
+                provided, the image file is not re-read from disk; a copy
+                of the base is painted on instead.
         """
 
-        pixmap = gui.QPixmap(filename)
-        width = pixmap.width()
-        height = pixmap.height()
+        if base is not None:
+            image = base.copy()
+        else:
+            image = _load_base_image(filename).copy()
+        MakeDeviceImage._paint_annotations(image, fulldata, title=title)
+        return image
+
+    @staticmethod
+    def _paint_annotations(image, fulldata, title=None):
+        """
+        Paint the labels and annotations in fulldata onto image, in place
+        """
+        width = image.width()
+        height = image.height()
 
-        label_size = min(height/30, width/30)
+        label_size = int(min(height/30, width/30))
         spacing = int(label_size * 0.2)
 
-        painter = gui.QPainter(pixmap)
-        data = copy.deepcopy(fulldata)
+        # only the top level is modified (the font entry is popped), so a
+        # shallow copy is enough
+        data = dict(fulldata)
         try:
             fontdict = data.pop('font')
             label_size = fontdict.get('label_size', label_size)
-            textfont = gui.QFont(fontdict['family'], label_size)
+            textfont, fontmetric = _get_font(fontdict['family'], label_size)
         except:
-            textfont = gui.QFont('Decorative', label_size)
-        fontmetric = gui.QFontMetrics(textfont)
+            textfont, fontmetric = _get_font('Decorative', label_size)
+
+        # all coordinates are integer pixels, so the cheaper int-based
+        # QRect can be used throughout; the box height never varies
+        rect_height = int(label_size + 2 * spacing)
+
+        # collect all geometry first, so that drawing happens in grouped
+        # passes with one brush/font change per group instead of per item
+        plain_rects = []
+        update_rects = []
+        texts = []
+
         if title:
-            painter.setBrush(gui.QColor(255, 255, 255, 100))
             textwidth = fontmetric.width(title)
-            rectangle_width = textwidth + 2 * spacing
-            rectangle_height = label_size + 2 * spacing
-            painter.drawRect(0,
-                             0,
-                             rectangle_width,
-                             rectangle_height)
-            painter.drawText(core.QRectF(spacing, spacing,
-                                         rectangle_width, rectangle_height),
-                             core.Qt.AlignTop + core.Qt.AlignLeft,
-                             title)
-
-        def recursively_paint(data):
+            rect = core.QRect(0, 0, textwidth + 2 * spacing, rect_height)
+            plain_rects.append(rect)
+            texts.append((rect.translated(spacing, spacing),
+                          core.Qt.AlignTop + core.Qt.AlignLeft,
+                          title))
+
+        def recursively_collect(data):
 
             for key, val in data.items():
                 if not hasattr(val, 'items'):
                     continue
                 paramsettings = val
                 if 'labelpos' in paramsettings:
-                    if paramsettings.get('labelstring'):
-                        label_string = paramsettings.get('labelstring')
-                    else:
-                        label_string = "{}_{} ".format(key, val)
-                    if paramsettings.get('update'):
-                        #parameters that are sweeped should be red.
-                        painter.setBrush(gui.QColor(255, 0, 0, 100))
-                    else:
-                        painter.setBrush(gui.QColor(255, 255, 255, 100))
+                    # the labelstring is resolved at insertion time; the
+                    # key is only a last resort for old annotation files
+                    label_string = paramsettings.get('labelstring') or key
                     (lx, ly) = paramsettings['labelpos']
                     textwidth = fontmetric.width(label_string)
-                    rectangle_start_x = lx - spacing
-                    rectangle_start_y = ly - spacing
-                    rectangle_width = textwidth+2*spacing
-                    rectangle_height = label_size+2*spacing
-                    painter.drawRect(rectangle_start_x,
-                                     rectangle_start_y,
-                                     rectangle_width,
-                                     rectangle_height)
-                    painter.setBrush(gui.QColor(25, 25, 25))
-
-                    painter.setFont(textfont)
-                    painter.drawText(core.QRectF(rectangle_start_x, rectangle_start_y,
-                                                 rectangle_width, rectangle_height),
-                                     core.Qt.AlignCenter,
-                                     label_string)
+                    rect = core.QRect(int(lx) - spacing, int(ly) - spacing,
+                                      textwidth + 2 * spacing, rect_height)
+                    if paramsettings.get('update'):
+                        # parameters that are sweeped should be red.
+                        update_rects.append(rect)
+                    else:
+                        plain_rects.append(rect)
+                    texts.append((rect, core.Qt.AlignCenter, label_string))
 
                 if 'annotationpos' in paramsettings:
                     (ax, ay) = paramsettings['annotationpos']
                     annotationstring = paramsettings['value']
 
                     textwidth = fontmetric.width(annotationstring)
-                    rectangle_start_x = ax - spacing
-                    rectangle_start_y = ay - spacing
-                    rectangle_width = textwidth + 2 * spacing
-                    rectangle_height = label_size + 2 * spacing
-                    painter.setBrush(gui.QColor(255, 255, 255, 100))
-                    painter.drawRect(rectangle_start_x,
-                                     rectangle_start_y,
-                                     rectangle_width,
-                                     rectangle_height)
-                    painter.setBrush(gui.QColor(50, 50, 50))
-                    painter.setFont(textfont)
-                    painter.drawText(core.QRectF(rectangle_start_x, rectangle_start_y,
-                                                 rectangle_width, rectangle_height),
-                                     core.Qt.AlignCenter,
-                                     annotationstring)
-                if hasattr(val, 'items'):
-                    recursively_paint(val)
-
-        recursively_paint(data)
+                    rect = core.QRect(int(ax) - spacing, int(ay) - spacing,
+                                      textwidth + 2 * spacing, rect_height)
+                    plain_rects.append(rect)
+                    texts.append((rect, core.Qt.AlignCenter,
+                                  annotationstring))
+
+                recursively_collect(val)
+
+        recursively_collect(data)
+
+        painter = gui.QPainter(image)
+        painter.setFont(textfont)
+        painter.setBrush(gui.QColor(255, 255, 255, 100))
+        for rect in plain_rects:
+            painter.drawRect(rect)
+        if update_rects:
+            painter.setBrush(gui.QColor(255, 0, 0, 100))
+            for rect in update_rects:
+                painter.drawRect(rect)
+        for rect, flags, text in texts:
+            painter.drawText(rect, flags, text)
         painter.end()
-        canvas.setPixmap(pixmap)
-
-        return canvas, pixmap
 
 
 class DeviceImage:
@@ -374,11 +574,16 @@ class DeviceImage:
         """
         Launch a Qt Widget to click
         """
-        if not qt.QApplication.instance():
-            app = qt.QApplication(sys.argv)
-        else:
-            app = qt.QApplication.instance()
+        app = _ensure_qapplication()
         self.imagedrawer = MakeDeviceImage(self.folder, self.station)
+
+        def annotations_ready(data, filename):
+            self._data = data
+            self.filename = filename
+            # leave the event loop once the current event is done
+            core.QTimer.singleShot(0, app.quit)
+
+        self.imagedrawer.annotationsReady.connect(annotations_ready)
         print("Please annotate device image")
         app.exec_()
 
@@ -387,8 +592,7 @@ class DeviceImage:
         Save annotated image to disk (image+instructions)
         """
         filename = os.path.join(self.folder, 'deviceimage_annotations.json')
-        with open(filename, 'w') as fid:
-            json.dump(self._data, fid)
+        _dump_json(self._data, filename)
 
     def loadAnnotations(self) -> bool:
         """
@@ -413,8 +617,7 @@ class DeviceImage:
         elif not json_found:
             return False
         # this assumes there is only on of deviceimage_raw.*
-        with open(json_full_filename, 'r') as fid:
-            self._data = json.load(fid)
+        self._data = _normalize_positions(_load_json(json_full_filename))
         return True
 
     def updateValues(self, station, sweeptparameters=None):
@@ -423,26 +626,30 @@ class DeviceImage:
         """
 
         def recursiveUpdataValues(qc_inst, data, sweeptparameters):
+            # hoist the dict lookups out of the loop; submodules are
+            # common, so dispatch on membership rather than on KeyError
+            parameters = qc_inst.parameters
+            submodules = qc_inst.submodules
             for key, val in data.items():
+                inst_param = parameters.get(key)
+                if inst_param is None:
+                    recursiveUpdataValues(submodules[key], val,
+                                          sweeptparameters)
+                    continue
+                value = inst_param.get_latest()
                 try:
-                    inst_param = qc_inst.parameters[key]
-                    value = inst_param.get_latest()
-                    try:
-                        floatvalue = float(value)
-                        if val.get('annotationformatter'):
-                            valuestr = val.get('annotationformatter').format(floatvalue)
-                        elif floatvalue > 1000 or floatvalue < 0.1:
-                            valuestr = "{:.2e}".format(floatvalue)
-                        else:
-                            valuestr = "{:.2f}".format(floatvalue)
-                        if inst_param in sweeptparameters:
-                            val['update'] = True
-                    except (ValueError, TypeError):
-                        valuestr = str(value)
-                    val['value'] = valuestr
-                except KeyError:
-                    subinst = qc_inst.submodules[key]
-                    recursiveUpdataValues(subinst, val, sweeptparameters)
+                    floatvalue = float(value)
+                    if val.get('annotationformatter'):
+                        valuestr = val.get('annotationformatter').format(floatvalue)
+                    elif floatvalue > 1000 or floatvalue < 0.1:
+                        valuestr = "{:.2e}".format(floatvalue)
+                    else:
+                        valuestr = "{:.2f}".format(floatvalue)
+                    if inst_param in sweeptparameters:
+                        val['update'] = True
+                except (ValueError, TypeError):
+                    valuestr = str(value)
+                val['value'] = valuestr
 
         for instrument, parameters in self._data.items():
             if instrument == 'font':
@@ -460,20 +667,28 @@ class DeviceImage:
         """
         if self.filename is None:
             raise ValueError('No image selected!')
-        if not qt.QApplication.instance():
-            app = qt.QApplication(sys.argv)
-        else:
-            app = qt.QApplication.instance()
-        win = qt.QWidget()
-        grid = qt.QGridLayout()
-        win.setLayout(grid)
-        win.imageCanvas = qt.QLabel()
-        grid.addWidget(win.imageCanvas)
-        win.imageCanvas, pixmap = MakeDeviceImage._renderImage(self._data,
-                                                               win.imageCanvas,
-                                                               self.filename,
-                                                               title)
+
         filename = '{:03d}_deviceimage.png'.format(counter)
         if path:
             filename = os.path.join(path, filename)
-        pixmap.save(filename, 'png')
+
+        # identical renders (same annotations, values, title and source
+        # image) are served from an on-disk cache as a plain file copy
+        cache_dir = os.path.join(self.folder, '.devimg_cache')
+        key = hashlib.sha1(
+            json.dumps(self._data, sort_keys=True).encode() +
+            str(os.path.getmtime(self.filename)).encode() +
+            str(title).encode()).hexdigest()
+        cached_png = os.path.join(cache_dir, key + '.png')
+        if os.path.exists(cached_png):
+            copyfile(cached_png, filename)
+            return
+
+        # fonts can only be used once a QApplication exists, but no
+        # widgets are needed just to paint and save an image
+        _ensure_qapplication()
+        image = MakeDeviceImage._paint_image(self._data, self.filename,
+                                             title=title)
+        image.save(filename, 'png')
+        os.makedirs(cache_dir, exist_ok=True)
+        copyfile(filename, cached_png)
@@ -4,8 +4,7 @@ from os import makedirs
 import os
 import logging
 from copy import deepcopy
-import numpy as np
-from typing import Optional, Tuple
+from typing import Tuple
 import functools
 import time
 import matplotlib.pyplot as plt
@@ -17,9 +16,7 @@ from qcodes.data.data_set import DataSet
 from qcodes.plots.pyqtgraph import QtPlot
 from qcodes.plots.qcmatplotlib import MatPlot
 from qcodes.instrument.visa import VisaInstrument
-from qcodes.utils.qcodes_device_annotator import DeviceImage
 
-from matplotlib import ticker
 from IPython import get_ipython
 
 log = logging.getLogger(__name__)
@@ -27,6 +24,12 @@ CURRENT_EXPERIMENT = {}
 CURRENT_EXPERIMENT["logging_enabled"] = False
 pdfdisplay = {}
 
+# path strings and FormatLocation built by init, keyed by
+# (abspath(mainfolder), sample_name), so that re-running an init cell
+# in a notebook only costs a folder stat instead of repeating the
+# construction work
+_INIT_CACHE = {}
+
 def init(mainfolder: str, sample_name: str, station, plot_x_position=0.66,
          annotate_image=True, display_pdf=True, display_individual_pdf=False):
     """
@@ -47,30 +50,42 @@ def init(mainfolder: str, sample_name: str, station, plot_x_position=0.66,
     if mainfolder[-1] == sep:
         mainfolder = mainfolder[:-1]
 
+    # resolve before keying the cache: a relative mainfolder must not
+    # hit an entry made under a different working directory
     mainfolder = abspath(mainfolder)
 
+    cache_key = (mainfolder, sample_name)
+    cached = _INIT_CACHE.get(cache_key)
+    if cached is None:
+        path_to_experiment_folder = os.path.join(mainfolder, sample_name) + sep
+        loc_provider = qc.FormatLocation(
+            fmt=path_to_experiment_folder + '{counter}')
+        cached = {"exp_folder": path_to_experiment_folder,
+                  "provider": loc_provider}
+        _INIT_CACHE[cache_key] = cached
+
+    path_to_experiment_folder = cached["exp_folder"]
+    loc_provider = cached["provider"]
+
+    # probed also on cache hits, so a folder removed mid-session gets
+    # recreated; a single stat is cheaper than a mkdir per path
+    # component
+    if not os.path.isdir(path_to_experiment_folder):
+        makedirs(path_to_experiment_folder, exist_ok=True)
+    pdf_folder = os.path.join(mainfolder, sample_name, 'pdf')
+    if not os.path.isdir(pdf_folder):
+        makedirs(pdf_folder, exist_ok=True)
+
     CURRENT_EXPERIMENT["mainfolder"] = mainfolder
     CURRENT_EXPERIMENT["sample_name"] = sample_name
     CURRENT_EXPERIMENT['init'] = True
 
     CURRENT_EXPERIMENT['plot_x_position'] = plot_x_position
 
-    path_to_experiment_folder = sep.join([mainfolder, sample_name, ""])
     CURRENT_EXPERIMENT["exp_folder"] = path_to_experiment_folder
     CURRENT_EXPERIMENT['pdf_subfolder'] = 'pdf'
-    try:
-        makedirs(path_to_experiment_folder)
-    except FileExistsError:
-        pass
-    try:
-        makedirs(sep.join([mainfolder, sample_name,
-                           CURRENT_EXPERIMENT['pdf_subfolder']]))
-    except FileExistsError:
-        pass
-    log.info("experiment started at {}".format(path_to_experiment_folder))
-
-    loc_provider = qc.FormatLocation(
-        fmt=path_to_experiment_folder + '{counter}')
+    log.info("experiment started at %s", path_to_experiment_folder)
+
     qc.data.data_set.DataSet.location_provider = loc_provider
     CURRENT_EXPERIMENT["provider"] = loc_provider
 
@@ -83,14 +98,14 @@ def init(mainfolder: str, sample_name: str, station, plot_x_position=0.66,
         raise RuntimeWarning("History can't be saved. "
                              "-Refusing to proceed (use IPython/jupyter)")
     else:
-        logfile = "{}{}".format(path_to_experiment_folder, "commands.log")
+        logfile = path_to_experiment_folder + "commands.log"
         CURRENT_EXPERIMENT['logfile'] = logfile
         if not CURRENT_EXPERIMENT["logging_enabled"]:
-            log.debug("Logging commands to: t{}".format(logfile))
+            log.debug("Logging commands to: t%s", logfile)
             ipython.magic("%logstart -t -o {} {}".format(logfile, "append"))
             CURRENT_EXPERIMENT["logging_enabled"] = True
         else:
-            log.debug("Logging already started at {}".format(logfile))
+            log.debug("Logging already started at %s", logfile)
 
     # Annotate image if wanted and necessary
     if annotate_image:
@@ -110,6 +125,10 @@ def init_python_logger():
 
 def _init_device_image(station):
 
+    # deferred: the annotator pulls in PyQt5, which is only needed when
+    # device images are actually in use
+    from qcodes.utils.qcodes_device_annotator import DeviceImage
+
     di = DeviceImage(CURRENT_EXPERIMENT["exp_folder"], station)
 
     success = di.loadAnnotations()
@@ -134,51 +153,86 @@ def _select_plottables(tasks):
     return tuple(plottables)
 
 
-def _plot_setup(data, inst_meas, useQT=True, startranges=None):
-    title = "{} #{:03d}".format(CURRENT_EXPERIMENT["sample_name"],
-                                data.location_provider.counter)
-    rasterized_note = " rasterized plot"
-    num_subplots = 0
-    counter_two = 0
+def _build_plot_spec(data, inst_meas):
+    """
+    Resolve the arrays of ``data`` that ``inst_meas`` maps onto subplots.
+
+    Returns a list of ``(j, k, data_array)`` tuples, where ``j`` indexes
+    the measured parameter, ``k`` the name within a multi-name parameter
+    (0 for simple parameters) and ``j + k + 1`` is the 1-based subplot
+    the array goes into. Building the spec once lets the live and the
+    static plot setup share the array lookups.
+    """
+    arrays = data.arrays
+    spec = []
     for j, i in enumerate(inst_meas):
+        # plain concatenation: str.format would re-parse the format
+        # string for every name
+        prefix = i._instrument.name + '_'
         if getattr(i, "names", False):
-            num_subplots += len(i.names)
+            # deal with multidimensional parameter
+            for k, name in enumerate(i.names):
+                spec.append((j, k, arrays[prefix + name]))
         else:
-            num_subplots += 1
+            # simple_parameters
+            spec.append((j, 0, arrays[prefix + i.name]))
+    return spec
+
+
+def _style_subplots(subplots, grids, titles, useQT):
+    """
+    Apply the grid and title settings collected during the add loop in
+    one pass over the subplots, so styling costs a single repaint
+    instead of one per call.
+
+    Args:
+        subplots: the plot's subplot sequence
+        grids: indices of the subplots that get a grid
+        titles: (index, title string) pairs
+        useQT: whether the subplots are pyqtgraph or matplotlib axes
+    """
     if useQT:
-        plot = QtPlot(fig_x_position=CURRENT_EXPERIMENT['plot_x_position'])
+        for idx in grids:
+            subplots[idx].showGrid(True, True)
+        for idx, subplot_title in titles:
+            subplots[idx].setTitle(subplot_title)
     else:
-        plot = MatPlot(subplots=(1, num_subplots))
+        for idx in grids:
+            subplots[idx].grid()
+        for idx, subplot_title in titles:
+            subplots[idx].set_title(subplot_title)
 
-    def _create_plot(plot, i, name, data, counter_two, j, k):
-        """
-        Args:
-            plot: The plot object, either QtPlot() or MatPlot()
-            i: The parameter to measure
-            name: -
-            data: The DataSet of the current measurement
-            counter_two: The sub-measurement counter. Each measurement has a
-                number and each sub-measurement has a counter.
-            j: The current sub-measurement
-            k: -
-        """
-        color = 'C' + str(counter_two)
-        counter_two += 1
-        inst_meas_name = "{}_{}".format(i._instrument.name, name)
-        inst_meas_data = getattr(data, inst_meas_name)
-        inst_meta_data = __get_plot_type(inst_meas_data, plot)
-        if useQT:
+
+def _plot_setup(data, inst_meas, useQT=True, startranges=None, spec=None):
+    title = "{} #{:03d}".format(CURRENT_EXPERIMENT["sample_name"],
+                                data.location_provider.counter)
+    rasterized_note = " rasterized plot"
+    if spec is None:
+        spec = _build_plot_spec(data, inst_meas)
+    num_subplots = len(spec)
+
+    # styling is collected here during the add loop and applied once
+    # afterwards by _style_subplots
+    grids = []
+    titles = []
+
+    if useQT:
+        plot = QtPlot(fig_x_position=CURRENT_EXPERIMENT['plot_x_position'])
+
+        def _add_trace(counter_two, j, k, inst_meas_data):
             plot.add(inst_meas_data, subplot=j + k + 1)
-            plot.subplots[j + k].showGrid(True, True)
+            grids.append(j + k)
             if j == 0:
-                plot.subplots[0].setTitle(title)
+                titles.append((0, title))
             else:
-                plot.subplots[j + k].setTitle("")
+                titles.append((j + k, ""))
 
-            plot.fixUnitScaling(startranges)
-            QtPlot.qc_helpers.foreground_qt_window(plot.win)
+    else:
+        plot = MatPlot(subplots=(1, num_subplots))
 
-        else:
+        def _add_trace(counter_two, j, k, inst_meas_data):
+            color = 'C' + str(counter_two)
+            inst_meta_data = __get_plot_type(inst_meas_data, plot)
             if 'z' in inst_meta_data:
                 xlen, ylen = inst_meta_data['z'].shape
                 rasterized = xlen*ylen > 5000
@@ -187,30 +241,44 @@ def _plot_setup(data, inst_meas, useQT=True, startranges=None):
             else:
                 rasterized = False
                 plot.add(inst_meas_data, subplot=j + k + 1, color=color)
-                plot.subplots[j + k].grid()
+                grids.append(j + k)
             if j == 0:
                 if rasterized:
                     fulltitle = title + rasterized_note
                 else:
                     fulltitle = title
-                plot.subplots[0].set_title(fulltitle)
+                titles.append((0, fulltitle))
             else:
                 if rasterized:
                     fulltitle = rasterized_note
                 else:
                     fulltitle = ""
-                plot.subplots[j + k].set_title(fulltitle)
+                titles.append((j + k, fulltitle))
 
-    for j, i in enumerate(inst_meas):
-        if getattr(i, "names", False):
-            # deal with multidimensional parameter
-            for k, name in enumerate(i.names):
-                _create_plot(plot, i, name, data, counter_two, j, k)
-                counter_two += 1
-        else:
-            # simple_parameters
-            _create_plot(plot, i, i.name, data, counter_two, j, 0)
-            counter_two += 1
+    if useQT:
+        # suspend window repaints while traces are added; every add
+        # otherwise triggers a full pyqtgraph layout pass
+        plot.win.setUpdatesEnabled(False)
+        try:
+            for counter_two, (j, k, inst_meas_data) in enumerate(spec):
+                _add_trace(counter_two, j, k, inst_meas_data)
+            _style_subplots(plot.subplots, grids, titles, useQT)
+        finally:
+            plot.win.setUpdatesEnabled(True)
+            plot.win.update()
+        plot.fixUnitScaling(startranges)
+        QtPlot.qc_helpers.foreground_qt_window(plot.win)
+    else:
+        was_interactive = plt.isinteractive()
+        plt.ioff()
+        try:
+            for counter_two, (j, k, inst_meas_data) in enumerate(spec):
+                _add_trace(counter_two, j, k, inst_meas_data)
+            _style_subplots(plot.subplots, grids, titles, useQT)
+        finally:
+            if was_interactive:
+                plt.ion()
+            plot.fig.canvas.draw_idle()
     return plot, num_subplots
 
 
@@ -226,18 +294,19 @@ def __get_plot_type(data, plot):
 
 def _save_individual_plots(data, inst_meas, display_plot=True):
 
+    # hoisted out of _create_plot: identical for every plot of this data
+    plot_title = "{} #{:03d}".format(CURRENT_EXPERIMENT["sample_name"],
+                                     data.location_provider.counter)
+    rasterized_note = " rasterized plot full data available in datafile"
+
     def _create_plot(i, name, data, counter_two, display_plot=True):
         # Step the color on all subplots no just on plots
         # within the same axis/subplot
         # this is to match the qcodes-pyqtplot behaviour.
-        title = "{} #{:03d}".format(CURRENT_EXPERIMENT["sample_name"],
-                                    data.location_provider.counter)
-        rasterized_note = " rasterized plot full data available in datafile"
         color = 'C' + str(counter_two)
         counter_two += 1
         plot = MatPlot()
-        inst_meas_name = "{}_{}".format(i._instrument.name, name)
-        inst_meas_data = getattr(data, inst_meas_name)
+        inst_meas_data = data.arrays[i._instrument.name + '_' + name]
         inst_meta_data = __get_plot_type(inst_meas_data, plot)
         if 'z' in inst_meta_data:
             xlen, ylen = inst_meta_data['z'].shape
@@ -248,9 +317,9 @@ def _save_individual_plots(data, inst_meas, display_plot=True):
             plot.add(inst_meas_data, color=color)
             plot.subplots[0].grid()
         if rasterized:
-            plot.subplots[0].set_title(title + rasterized_note)
+            plot.subplots[0].set_title(plot_title + rasterized_note)
         else:
-            plot.subplots[0].set_title(title)
+            plot.subplots[0].set_title(plot_title)
         title_list = plot.get_default_title().split(sep)
         title_list.insert(-1 , CURRENT_EXPERIMENT['pdf_subfolder'])
         title = sep.join(title_list)
@@ -276,6 +345,23 @@ def _save_individual_plots(data, inst_meas, display_plot=True):
             counter_two += 1
 
 
+def _throttled(fn, every):
+    """
+    Wrap the no-argument callable ``fn`` so that only every ``every``-th
+    call goes through. Used to decouple the live-plot update rate from
+    the measurement rate: for fast sweeps a redraw per point dominates
+    the wall time.
+    """
+    counter = [0]
+
+    def wrapped():
+        counter[0] += 1
+        if counter[0] % every == 0:
+            fn()
+
+    return wrapped
+
+
 def _flush_buffers(*params):
     """
     If possible, flush the VISA buffer of the instrument of the
@@ -292,15 +378,15 @@ def _flush_buffers(*params):
                 status_code = inst.visa_handle.clear()
                 if status_code is not None:
                     log.warning("Cleared visa buffer on "
-                                "{} with status code {}".format(inst.name,
-                                                                status_code))
+                                "%s with status code %s", inst.name,
+                                status_code)
         elif isinstance(param, VisaInstrument):
             inst = param
             status_code = inst.visa_handle.clear()
             if status_code is not None:
                 log.warning("Cleared visa buffer on "
-                            "{} with status code {}".format(inst.name,
-                                                            status_code))
+                            "%s with status code %s", inst.name,
+                            status_code)
 
 
 def save_device_image(sweeptparameters):
@@ -363,15 +449,27 @@ def _do_measurement(loop: Loop, set_params: tuple, meas_params: tuple,
         data = loop.get_data_set()
 
         if do_plots:
+            # resolved once and shared with the static pdf plot below
+            plot_spec = _build_plot_spec(data, meas_params)
             try:
-                plot, _ = _plot_setup(data, meas_params, startranges=startranges)
+                plot, _ = _plot_setup(data, meas_params,
+                                      startranges=startranges, spec=plot_spec)
             except (ClosedError, ConnectionError):
                 log.warning('Remote process crashed png will not be saved')
         else:
             plot = None
         try:
             if do_plots:
-                _ = loop.with_bg_task(plot.update).run(use_threads=use_threads)
+                # update the plot only every plot_update_every points;
+                # the final update makes sure no points are left undrawn
+                every = CURRENT_EXPERIMENT.get('plot_update_every', 1)
+                if every > 1:
+                    _ = loop.with_bg_task(_throttled(plot.update, every),
+                                          plot.update).run(
+                                              use_threads=use_threads)
+                else:
+                    _ = loop.with_bg_task(plot.update).run(
+                        use_threads=use_threads)
             else:
                 _ = loop.run(use_threads=use_threads)
         except KeyboardInterrupt:
@@ -385,7 +483,8 @@ def _do_measurement(loop: Loop, set_params: tuple, meas_params: tuple,
             except (ClosedError, ConnectionError):
                 log.warning('Remote process crashed png will not be saved')
             plt.ioff()
-            pdfplot, num_subplots = _plot_setup(data, meas_params, useQT=False)
+            pdfplot, num_subplots = _plot_setup(data, meas_params,
+                                                useQT=False, spec=plot_spec)
             # pad a bit more to prevent overlap between
             # suptitle and title
             pdfplot.rescale_axis()
@@ -442,7 +541,9 @@ def do1d(inst_set, start, stop, num_points, delay, *inst_meas, do_plots=True,
         plot, data : returns the plot and the dataset
 
     """
-    log.info("Starting do1D sweeping {} from {} to {} in {} steps measuring {}".format(inst_set.name, start, stop, num_points, inst_meas))
+    log.info("Starting do1D sweeping %s from %s to %s in %s steps"
+             " measuring %s", inst_set.name, start, stop, num_points,
+             inst_meas)
     loop = qc.Loop(inst_set.sweep(start,
                                   stop,
                                   num=num_points), delay).each(*inst_meas)
@@ -453,7 +554,8 @@ def do1d(inst_set, start, stop, num_points, delay, *inst_meas, do_plots=True,
     plot, data = _do_measurement(loop, set_params, meas_params,
                                  do_plots=do_plots, use_threads=use_threads)
     stop = time.perf_counter()
-    log.info("running do1D took {:.6f} s at {:.6f} s per point".format(stop-start, (stop-start)/num_points))
+    log.info("running do1D took %.6f s at %.6f s per point",
+             stop-start, (stop-start)/num_points)
     return plot, data
 
 
@@ -525,11 +627,10 @@ def do2d(inst_set, start, stop, num_points, delay,
         plot, data : returns the plot and the dataset
 
     """
-    log.info("Starting do2D sweeping {} from {} to {} in {} steps and"
-             " {} from {} to {} in {} steps "
-             "measuring {}".format(inst_set.name, start, stop, num_points,
-                                   inst_set2.name, start2, stop2, num_points2,
-                                   inst_meas))
+    log.info("Starting do2D sweeping %s from %s to %s in %s steps and"
+             " %s from %s to %s in %s steps "
+             "measuring %s", inst_set.name, start, stop, num_points,
+             inst_set2.name, start2, stop2, num_points2, inst_meas)
     for inst in inst_meas:
         if getattr(inst, "setpoints", False):
             raise ValueError("3d plotting is not supported")
@@ -550,11 +651,48 @@ def do2d(inst_set, start, stop, num_points, delay,
     plot, data = _do_measurement(outerloop, set_params, meas_params,
                                  do_plots=do_plots, use_threads=use_threads)
     stop = time.perf_counter()
-    log.info("running do2D took {:.6f} s at {:.6f} s per line and {:.6f} s per point".format(stop-start,
-             (stop-start)/num_points, (stop-start)/(num_points*num_points2)))
+    log.info("running do2D took %.6f s at %.6f s per line and %.6f s per point",
+             stop-start, (stop-start)/num_points,
+             (stop-start)/(num_points*num_points2))
     return plot, data
 
 
+class _LazyPlots:
+    """
+    Sequence-like container of the plots belonging to a dataset that
+    builds each plot on first access. Instantiating a QtPlot opens a
+    window per array, which is wasted work when only one of several
+    measured arrays is actually inspected.
+    """
+
+    def __init__(self, names, make_plot):
+        self._names = names
+        self._make_plot = make_plot
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __getitem__(self, index):
+        if index not in self._cache:
+            self._cache[index] = self._make_plot(self._names[index])
+        return self._cache[index]
+
+
+@functools.lru_cache(maxsize=64)
+def _load_by_location(location):
+    """
+    Load the dataset at the given location string.
+
+    Cached so that calling show_num repeatedly on the same id, as one
+    does while inspecting data in a notebook, only reads from disk once.
+    Keyed on the resolved location rather than the counter, since the
+    location provider changes when init is called for another sample.
+    Use show_num.cache_clear() if a dataset changed on disk.
+    """
+    return qc.load_data(location)
+
+
 def show_num(id, useQT=False, **kwargs):
     """
     Show  and return plot and data for id in current instrument.
@@ -564,34 +702,37 @@ def show_num(id, useQT=False, **kwargs):
         **kwargs: Are passed to plot function
 
     Returns:
-        plot, data : returns the plot and the dataset
+        data, plots : returns the dataset and a lazy sequence of plots,
+            each plot being created on first access
 
     """
-    if not getattr(CURRENT_EXPERIMENT, "init", True):
+    if not CURRENT_EXPERIMENT.get("init", False):
         raise RuntimeError("Experiment not initalized. "
                            "use qc.Init(mainfolder, samplename)")
 
     str_id = '{0:03d}'.format(id)
 
-    t = qc.DataSet.location_provider.fmt.format(counter=str_id)
-    data = qc.load_data(t)
-
-    plots = []
-    for value in data.arrays.keys():
-        if "set" not in value:
-            if useQT:
-                plot = QtPlot(getattr(data, value),
-                              fig_x_position=CURRENT_EXPERIMENT['plot_x_position'],
-                              **kwargs)
-                title = "{} #{}".format(CURRENT_EXPERIMENT["sample_name"],
-                                        str_id)
-                plot.subplots[0].setTitle(title)
-                plot.subplots[0].showGrid(True, True)
-            else:
-                plot = MatPlot(getattr(data, value), **kwargs)
-                title = "{} #{}".format(CURRENT_EXPERIMENT["sample_name"],
-                                        str_id)
-                plot.subplots[0].set_title(title)
-                plot.subplots[0].grid()
-            plots.append(plot)
-    return data, plots
+    location = qc.DataSet.location_provider.fmt.format(counter=str_id)
+    data = _load_by_location(location)
+
+    title = "{} #{}".format(CURRENT_EXPERIMENT["sample_name"], str_id)
+
+    def _make_plot(value):
+        if useQT:
+            plot = QtPlot(data.arrays[value],
+                          fig_x_position=CURRENT_EXPERIMENT['plot_x_position'],
+                          **kwargs)
+            plot.subplots[0].setTitle(title)
+            plot.subplots[0].showGrid(True, True)
+        else:
+            plot = MatPlot(data.arrays[value], **kwargs)
+            plot.subplots[0].set_title(title)
+            plot.subplots[0].grid()
+        return plot
+
+    names = [value for value in data.arrays if not value.endswith('_set')]
+    return data, _LazyPlots(names, _make_plot)
+
+
+# let users drop cached datasets, e.g. after editing files on disk
+show_num.cache_clear = _load_by_location.cache_clear